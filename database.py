@@ -6,10 +6,11 @@ Import and use these functions in your API endpoints for database operations.
 """
 
 from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
-from typing import Union
+from typing import List, Union
 from pydantic import BaseModel
 
 # Load environment variables from .env file
@@ -17,13 +18,40 @@ load_dotenv()
 
 _client = None
 db = None
+_motor_client = None
+motor_db = None
 
 database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    # Sync client only backs the helper functions below (scripts, tooling), so keep
+    # its pool small and lazily opened
+    _client = MongoClient(database_url, maxPoolSize=5, serverSelectionTimeoutMS=3000, retryWrites=True)
     db = _client[database_name]
+    # Pooled async client shared by all request handlers in this process
+    # (TCP keepalive is always on in pymongo 4)
+    _motor_client = AsyncIOMotorClient(
+        database_url,
+        maxPoolSize=50,
+        minPoolSize=5,
+        waitQueueTimeoutMS=2000,
+        serverSelectionTimeoutMS=3000,
+        retryWrites=True,
+    )
+    motor_db = _motor_client[database_name]
+
+def _timestamped(data: Union[BaseModel, dict], now: datetime) -> dict:
+    """Copy data into a plain dict stamped with created_at/updated_at"""
+    # Convert Pydantic model to dict if needed
+    if isinstance(data, BaseModel):
+        data_dict = data.model_dump()
+    else:
+        data_dict = data.copy()
+
+    data_dict['created_at'] = now
+    data_dict['updated_at'] = now
+    return data_dict
 
 # Helper functions for common database operations
 def create_document(collection_name: str, data: Union[BaseModel, dict]):
@@ -31,18 +59,35 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
-    # Convert Pydantic model to dict if needed
-    if isinstance(data, BaseModel):
-        data_dict = data.model_dump()
-    else:
-        data_dict = data.copy()
+    result = db[collection_name].insert_one(_timestamped(data, datetime.now(timezone.utc)))
+    return str(result.inserted_id)
+
+def create_documents(collection_name: str, data_list: List[Union[BaseModel, dict]]):
+    """Insert many documents with timestamps in a single unordered batch"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
 
-    data_dict['created_at'] = datetime.now(timezone.utc)
-    data_dict['updated_at'] = datetime.now(timezone.utc)
+    now = datetime.now(timezone.utc)
+    result = db[collection_name].insert_many([_timestamped(d, now) for d in data_list], ordered=False)
+    return [str(_id) for _id in result.inserted_ids]
 
-    result = db[collection_name].insert_one(data_dict)
+async def create_document_async(collection_name: str, data: Union[BaseModel, dict]):
+    """Insert a single document with timestamp without blocking the event loop"""
+    if motor_db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    result = await motor_db[collection_name].insert_one(_timestamped(data, datetime.now(timezone.utc)))
     return str(result.inserted_id)
 
+async def create_documents_async(collection_name: str, data_list: List[Union[BaseModel, dict]]):
+    """Insert many documents with timestamps without blocking the event loop"""
+    if motor_db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    now = datetime.now(timezone.utc)
+    result = await motor_db[collection_name].insert_many([_timestamped(d, now) for d in data_list], ordered=False)
+    return [str(_id) for _id in result.inserted_ids]
+
 def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
     """Get documents from collection"""
     if db is None:
@@ -1,36 +1,57 @@
 import os
 import math
+import time
+from functools import lru_cache
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
+from urllib.parse import quote_plus
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field
 from bson import ObjectId
+import orjson
 
-from database import db, create_document, get_documents
+from database import motor_db, create_document_async, create_documents_async
 
-app = FastAPI(title="FlareChef API", version="1.0.0")
+app = FastAPI(title="FlareChef API", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Comma-separated list of allowed frontend origins; defaults to any origin.
+# No cookies/auth are used, so credentials stay off (a wildcard origin with
+# credentials is invalid CORS anyway).
+CORS_ORIGINS = [o.strip() for o in os.getenv("CORS_ORIGINS", "*").split(",") if o.strip()]
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_credentials=False,
+    allow_methods=["GET", "POST"],
+    allow_headers=["content-type"],
+    max_age=86400,
 )
+# Added last so it wraps CORS; recipe lists are repetitive JSON and compress well
+app.add_middleware(GZipMiddleware, minimum_size=512)
 
 
 # ---------- Models ----------
 class GenerateRequest(BaseModel):
-    ingredients: str = Field(..., min_length=2, description="Comma-separated ingredients list")
+    model_config = ConfigDict(extra="ignore")
+
+    # Bounded so the per-process generate_recipe_json cache stays small
+    ingredients: str = Field(..., min_length=2, max_length=1000, description="Comma-separated ingredients list")
 
 class NutritionModel(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     calories: int
     protein: float
     carbs: float
     fat: float
 
 class RecipeModel(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     title: str
     description: str
     ingredients: List[str]
@@ -44,7 +65,7 @@ class SaveRecipeRequest(RecipeModel):
 
 class RecipeInDB(RecipeModel):
     id: str
-    created_at: Optional[str] = None
+    created_at: Optional[datetime] = None
 
 
 # ---------- Utilities ----------
@@ -66,28 +87,29 @@ CALORIE_HINTS = {
     "bread": (79, 3, 15, 1),
     "avocado": (160, 2, 9, 15),
 }
+# Scanned in dict order: the first key found in an ingredient wins
+CALORIE_KEYS = tuple(CALORIE_HINTS)
+CALORIE_VALS = tuple(CALORIE_HINTS.values())
+# Applied to ingredients with no known hint
+DEFAULT_HINT = (40, 0.0, 5.0, 0.0)
 
 FALLBACK_IMAGE = "https://images.unsplash.com/photo-1504674900247-0877df9cc836?q=80&w=1600&auto=format&fit=crop"
+UNSPLASH_QUERY_PREFIX = "https://source.unsplash.com/featured/?"
 
 
-def estimate_nutrition(ings: List[str]) -> NutritionModel:
-    total_cals = total_pro = total_carb = total_fat = 0.0
-    for raw in ings:
-        k = raw.strip().lower()
-        found = None
-        for key in CALORIE_HINTS:
+@lru_cache(maxsize=4096)
+def estimate_nutrition(ings: Tuple[str, ...]) -> NutritionModel:
+    """Inputs are pre-stripped, non-empty and lowercased"""
+    rows = []
+    for k in ings:
+        for i, key in enumerate(CALORIE_KEYS):
             if key in k:
-                found = key
+                rows.append(CALORIE_VALS[i])
                 break
-        if found:
-            c, p, cb, f = CALORIE_HINTS[found]
-            total_cals += c
-            total_pro += p
-            total_carb += cb
-            total_fat += f
         else:
-            total_cals += 40
-            total_carb += 5
+            rows.append(DEFAULT_HINT)
+    # One row per ingredient, then reduce each column once
+    total_cals, total_pro, total_carb, total_fat = map(sum, zip(*rows)) if rows else (0, 0, 0, 0)
     return NutritionModel(
         calories=int(total_cals),
         protein=round(total_pro, 1),
@@ -96,44 +118,149 @@ def estimate_nutrition(ings: List[str]) -> NutritionModel:
     )
 
 
-def craft_title(ings: List[str]) -> str:
-    core = [i.strip().title() for i in ings if i.strip()]
-    if not core:
+@lru_cache(maxsize=4096)
+def craft_title(ings: Tuple[str, ...]) -> str:
+    """Inputs are pre-stripped, non-empty and title-cased"""
+    if not ings:
         return "FlareChef Creation"
-    if len(core) == 1:
-        return f"Ignited {core[0]} Delight"
-    return f"Flame-Kissed {' & '.join(core[:2])}{' Medley' if len(core)>2 else ''}"
+    if len(ings) == 1:
+        return f"Ignited {ings[0]} Delight"
+    return f"Flame-Kissed {' & '.join(ings[:2])}{' Medley' if len(ings)>2 else ''}"
 
 
-def craft_description(ings: List[str]) -> str:
-    base = ", ".join([i.strip() for i in ings if i.strip()])
+def craft_description(ings: Tuple[str, ...]) -> str:
+    """Inputs are pre-stripped and non-empty"""
+    base = ", ".join(ings)
     return f"A warm, glowing recipe that turns {base} into a cozy, restaurant-worthy dish."
 
 
-def craft_steps(ings: List[str]) -> List[str]:
-    lead = ings[0].strip().lower() if ings else "ingredients"
-    return [
+@lru_cache(maxsize=4096)
+def craft_steps(ings: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Inputs are pre-stripped, non-empty and lowercased"""
+    lead = ings[0] if ings else "ingredients"
+    return (
         "Preheat a skillet until it softly shimmers like a flame.",
         f"Add {lead} with a drizzle of oil; sear until lightly caramelized.",
         "Fold in remaining ingredients and season with salt, pepper, and a hint of heat.",
         "Simmer until flavors meld and textures are tender.",
         "Finish with fresh herbs or citrus and serve warm."
-    ]
+    )
 
 
-def compute_time(ings: List[str]) -> int:
+def compute_time(ings: Tuple[str, ...]) -> int:
+    """Inputs are pre-stripped and non-empty"""
     base = 10 + 5 * len(ings)
     return min(max(base, 15), 75)
 
 
+@lru_cache(maxsize=2048)
+def generate_recipe_json(stripped: Tuple[str, ...]) -> bytes:
+    """Serialized recipe; inputs are pre-stripped and non-empty. Pure, so safe to cache per process"""
+    lower = tuple(map(str.lower, stripped))
+    titled = tuple(map(str.title, stripped))
+
+    title = craft_title(titled)
+    description = craft_description(stripped)
+    steps = list(craft_steps(lower))
+    time_minutes = compute_time(stripped)
+    # Nutrition is order-insensitive, so sort for a better cache hit rate
+    nutrition = estimate_nutrition(tuple(sorted(lower)))
+
+    # Simple image sourcing using Unsplash query
+    query = quote_plus(",".join(stripped[:3])) or "food"
+    image_url = UNSPLASH_QUERY_PREFIX + query
+
+    # Every field is built right here, so skip validation
+    recipe = RecipeModel.model_construct(
+        title=title,
+        description=description,
+        ingredients=list(stripped),
+        steps=steps,
+        time_minutes=time_minutes,
+        nutrition=nutrition,
+        image_url=image_url or FALLBACK_IMAGE,
+    )
+    return orjson.dumps(recipe.model_dump())
+
+
+# Only the fields recipe_out() reads; keeps BSON payloads small
+RECIPE_PROJECTION = {
+    "title": 1,
+    "description": 1,
+    "ingredients": 1,
+    "steps": 1,
+    "time_minutes": 1,
+    "nutrition": 1,
+    "image_url": 1,
+    "created_at": 1,
+}
+
+
+def recipe_out(doc: dict) -> dict:
+    # Required recipe fields are indexed directly; optional ones (image_url, and
+    # created_at which only the create_document* helpers stamp) may be missing
+    return {
+        "id": str(doc["_id"]),
+        "title": doc["title"],
+        "description": doc["description"],
+        "ingredients": doc["ingredients"],
+        "steps": doc["steps"],
+        "time_minutes": doc["time_minutes"],
+        "nutrition": doc["nutrition"],
+        "image_url": doc.get("image_url"),
+        # orjson encodes datetimes natively, no isoformat() round-trip needed
+        "created_at": doc.get("created_at"),
+    }
+
+
+# ---------- Lifecycle ----------
+@app.on_event("startup")
+async def warm_database():
+    if motor_db is None:
+        return
+    try:
+        # Open pooled connections now so the first request doesn't pay the handshake
+        await motor_db.command("ping")
+    except Exception:
+        # /test reports connectivity problems; don't block startup on them
+        pass
+
+
+@app.on_event("startup")
+async def ensure_indexes():
+    if motor_db is None:
+        return
+    try:
+        # Lets list_recipes stream newest-first straight off the index
+        await motor_db["recipe"].create_index([("created_at", -1), ("_id", -1)])
+    except Exception:
+        # Listing still works without the index, just slower
+        pass
+
+
+# Health-check collection listing, refreshed at most every COLLECTIONS_TTL seconds
+COLLECTIONS_TTL = 30
+# (fetched_at, names), or None until the first fetch
+_collections_cache = None
+
+
+async def cached_collection_names() -> List[str]:
+    global _collections_cache
+    now = time.monotonic()
+    if _collections_cache is None or now - _collections_cache[0] > COLLECTIONS_TTL:
+        names = (await motor_db.list_collection_names())[:10]
+        _collections_cache = (now, names)
+    return _collections_cache[1]
+
+
 # ---------- Routes ----------
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "FlareChef API is running"}
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -143,11 +270,13 @@ def test_database():
         "collections": []
     }
     try:
-        if db is not None:
+        if motor_db is not None:
             response["database"] = "✅ Available"
             response["connection_status"] = "Connected"
             try:
-                response["collections"] = db.list_collection_names()[:10]
+                # ping is O(1) server-side; listCollections is only re-run when the cache expires
+                await motor_db.command("ping")
+                response["collections"] = await cached_collection_names()
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
                 response["database"] = f"⚠️ Connected but Error: {str(e)[:80]}"
@@ -157,97 +286,61 @@ def test_database():
 
 
 @app.post("/api/generate", response_model=RecipeModel)
-def generate_recipe(payload: GenerateRequest):
-    ingredients = [i.strip() for i in payload.ingredients.split(',') if i.strip()]
-    if not ingredients:
+async def generate_recipe(payload: GenerateRequest):
+    # Normalize once; helpers receive the form they need and never re-strip
+    stripped = tuple(filter(None, map(str.strip, payload.ingredients.split(','))))
+    if not stripped:
         raise HTTPException(status_code=400, detail="Please provide at least one ingredient.")
-
-    title = craft_title(ingredients)
-    description = craft_description(ingredients)
-    steps = craft_steps(ingredients)
-    time_minutes = compute_time(ingredients)
-    nutrition = estimate_nutrition(ingredients)
-
-    # Simple image sourcing using Unsplash query
-    query = "+".join(ingredients[:3]) or "food"
-    image_url = f"https://source.unsplash.com/featured/?{query}"
-
-    return RecipeModel(
-        title=title,
-        description=description,
-        ingredients=ingredients,
-        steps=steps,
-        time_minutes=time_minutes,
-        nutrition=nutrition,
-        image_url=image_url or FALLBACK_IMAGE,
-    )
+    # response_model only documents the shape; the cached body is sent as-is
+    return Response(content=generate_recipe_json(stripped), media_type="application/json")
 
 
 @app.post("/api/recipes", response_model=dict)
-def save_recipe(payload: SaveRecipeRequest):
-    if db is None:
+async def save_recipe(payload: SaveRecipeRequest):
+    if motor_db is None:
         raise HTTPException(status_code=500, detail="Database not configured")
-    doc = payload.model_dump()
-    inserted_id = create_document("recipe", doc)
+    inserted_id = await create_document_async("recipe", payload)
     return {"id": inserted_id, "status": "saved"}
 
 
-@app.get("/api/recipes", response_model=List[RecipeInDB])
-def list_recipes(limit: int = 20):
-    if db is None:
-        return []
-    docs = get_documents("recipe", limit=limit)
-    results: List[RecipeInDB] = []
-    for d in docs[::-1]:
-        rid = str(d.get("_id"))
-        created = d.get("created_at")
-        created_str = None
-        if created:
-            try:
-                created_str = created.isoformat()
-            except Exception:
-                created_str = str(created)
-        results.append(RecipeInDB(
-            id=rid,
-            title=d.get("title", "Recipe"),
-            description=d.get("description", ""),
-            ingredients=d.get("ingredients", []),
-            steps=d.get("steps", []),
-            time_minutes=int(d.get("time_minutes", 20)),
-            nutrition=NutritionModel(**d.get("nutrition", {"calories":0,"protein":0,"carbs":0,"fat":0})),
-            image_url=d.get("image_url"),
-            created_at=created_str,
-        ))
-    return results
-
-
-@app.get("/api/recipes/{recipe_id}", response_model=RecipeInDB)
-def get_recipe(recipe_id: str):
-    if db is None:
+@app.post("/api/recipes/bulk", response_model=dict)
+async def save_recipes_bulk(payload: List[SaveRecipeRequest]):
+    if motor_db is None:
+        raise HTTPException(status_code=500, detail="Database not configured")
+    if not payload:
+        return {"ids": [], "status": "saved"}
+    inserted_ids = await create_documents_async("recipe", payload)
+    return {"ids": inserted_ids, "status": "saved"}
+
+
+# responses= documents the schema without re-validating the plain dicts we return
+@app.get("/api/recipes", responses={200: {"model": List[RecipeInDB]}})
+async def list_recipes(limit: int = 20):
+    if motor_db is None:
+        return ORJSONResponse([])
+    cursor = motor_db["recipe"].find({}, RECIPE_PROJECTION).sort([("created_at", -1), ("_id", -1)]).limit(limit)
+    docs = await cursor.to_list(length=None)
+    return ORJSONResponse([recipe_out(d) for d in docs])
+
+
+@app.get("/api/recipes/{recipe_id}", responses={200: {"model": RecipeInDB}})
+async def get_recipe(recipe_id: str):
+    if motor_db is None:
         raise HTTPException(status_code=500, detail="Database not configured")
     try:
         obj_id = ObjectId(recipe_id)
     except Exception:
         raise HTTPException(status_code=400, detail="Invalid recipe id")
-    doc = db["recipe"].find_one({"_id": obj_id})
+    doc = await motor_db["recipe"].find_one({"_id": obj_id}, RECIPE_PROJECTION)
     if not doc:
         raise HTTPException(status_code=404, detail="Recipe not found")
-    created = doc.get("created_at")
-    created_str = created.isoformat() if hasattr(created, 'isoformat') else str(created)
-    return RecipeInDB(
-        id=str(doc.get("_id")),
-        title=doc.get("title", "Recipe"),
-        description=doc.get("description", ""),
-        ingredients=doc.get("ingredients", []),
-        steps=doc.get("steps", []),
-        time_minutes=int(doc.get("time_minutes", 20)),
-        nutrition=NutritionModel(**doc.get("nutrition", {"calories":0,"protein":0,"carbs":0,"fat":0})),
-        image_url=doc.get("image_url"),
-        created_at=created_str,
-    )
+    return ORJSONResponse(recipe_out(doc))
 
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    workers = int(os.getenv("WEB_CONCURRENCY", min(os.cpu_count() or 2, 8)))
+    # The app is passed as an import string so each worker process imports it
+    # (and opens its own Mongo pools) instead of inheriting this one's
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers, loop="uvloop", http="httptools")
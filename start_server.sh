@@ -15,5 +15,8 @@ mkdir -p logs
 echo "Installing dependencies..."
 pip install -r requirements.txt
 echo "Starting FastAPI server..."
-nohup uvicorn main:app --host 0.0.0.0 --port 8000 --reload > logs/server.log 2>&1 
+# --reload can't be combined with --workers; run one worker per core (max 8) unless WEB_CONCURRENCY is set
+CORES=$(nproc 2>/dev/null || echo 2)
+WORKERS=${WEB_CONCURRENCY:-$(( CORES < 8 ? CORES : 8 ))}
+nohup uvicorn main:app --host 0.0.0.0 --port ${PORT:-8000} --workers $WORKERS --loop uvloop --http httptools > logs/server.log 2>&1 
 echo "Server started in background"